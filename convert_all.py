@@ -1,9 +1,28 @@
 #!/usr/bin/env python3
-"""Convert all games to YAFF format."""
+"""
+Convert all games to YAFF format.
 
+Games are converted in a shared pool of worker processes without a per-game
+time limit: a game that makes the converter hang stalls the whole batch, and a
+worker that crashes hard fails every game still pending.
+"""
+
+import contextlib
+import io
 import os
-import subprocess
 import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import deathgenerator2yaff
+
+def init_worker(game_metadata):
+    """Give a worker process the game metadata loaded once by the parent."""
+    deathgenerator2yaff.set_game_metadata(game_metadata)
+
+def convert_game(game_dir, output_dir):
+    """Convert one game in a worker process, silencing its per-font report."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return deathgenerator2yaff.convert(game_dir, output_dir)
 
 def main():
     if len(sys.argv) < 3:
@@ -13,17 +32,16 @@ def main():
 
     input_dir = sys.argv[1]
     output_dir = sys.argv[2]
-    script_path = 'deathgenerator2yaff.py'
-    python_path = sys.executable  # Use current Python interpreter
 
-    # Get all game directories
+    # Get all game directories; DirEntry caches the file type, saving a stat per entry
     game_dirs = []
-    for item in sorted(os.listdir(input_dir)):
-        game_path = os.path.join(input_dir, item)
-        if os.path.isdir(game_path):
-            json_file = os.path.join(game_path, f"{item}.json")
+    with os.scandir(input_dir) as it:
+        entries = sorted(it, key=lambda entry: entry.name)
+    for entry in entries:
+        if entry.is_dir():
+            json_file = os.path.join(entry.path, f"{entry.name}.json")
             if os.path.exists(json_file):
-                game_dirs.append(game_path)
+                game_dirs.append(entry.path)
 
     print(f"Found {len(game_dirs)} games to convert\n")
 
@@ -31,36 +49,38 @@ def main():
     skip_count = 0
     error_count = 0
 
-    for game_dir in game_dirs:
-        game_name = os.path.basename(game_dir)
-        print(f"Processing {game_name}...")
-
-        try:
-            result = subprocess.run(
-                [python_path, script_path, game_dir, output_dir],
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-
-            if result.returncode == 0:
-                # Count generated and skipped files
-                output = result.stdout
-                if 'Generated' in output:
+    # Load the game metadata once here and hand it to the workers, so a missing
+    # generators.js is reported a single time rather than once per worker
+    game_metadata = deathgenerator2yaff.load_game_metadata()
+
+    # Convert in-process to avoid one interpreter start-up per game; the pixel
+    # analysis holds the GIL, so fan out over worker processes rather than
+    # threads
+    with ProcessPoolExecutor(
+        max_workers=os.cpu_count(),
+        initializer=init_worker,
+        initargs=(game_metadata,)
+    ) as executor:
+        futures = {}
+        for game_dir in game_dirs:
+            print(f"Processing {os.path.basename(game_dir)}...")
+            future = executor.submit(convert_game, game_dir, output_dir)
+            futures[future] = game_dir
+
+        # Tally results on the main process as they finish
+        for future in as_completed(futures):
+            game_name = os.path.basename(futures[future])
+
+            try:
+                generated, skipped = future.result()
+                if generated:
                     success_count += 1
                     print(f"  ✓ {game_name}")
-                if 'SKIPPED' in output:
-                    skip_count += output.count('SKIPPED')
-            else:
+                skip_count += skipped
+
+            except Exception as e:
                 error_count += 1
-                print(f"  ✗ {game_name}: {result.stderr.strip()}")
-
-        except subprocess.TimeoutExpired:
-            error_count += 1
-            print(f"  ✗ {game_name}: Timeout")
-        except Exception as e:
-            error_count += 1
-            print(f"  ✗ {game_name}: {str(e)}")
+                print(f"  ✗ {game_name}: {str(e)}")
 
     print(f"\nConversion complete!")
     print(f"  Success: {success_count} games")
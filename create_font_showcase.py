@@ -3,187 +3,271 @@
 Generate a PNG showcasing all YAFF fonts with demo text in an ultra-compact layout.
 """
 
+import functools
+import json
 import os
-import subprocess
+import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
+import monobit
+import numpy as np
 from PIL import Image, ImageDraw
 
+# Demo text sections by coverage label, in display order:
+# (labels that enable the section, text for uppercase-only fonts, text otherwise)
+# A text of None leaves the section out for that case.
+DEMO_SECTIONS = [
+    ({'latin1'}, None, "ñäéö"),             # Latin-1 (characters with diacritics)
+    ({'latinext'}, "ŁŚŻš", "ŁŚŻš"),         # Latin Extended
+    ({'cyrillic'}, "БЫАГ", "быаг"),         # Cyrillic
+    ({'greek'}, "Γαβδ", "Γαβδ"),            # Greek
+    ({'kana'}, "いろは", "いろは"),            # Kana
+    ({'bopomofo'}, "ㄅㄆㄇㄈ", "ㄅㄆㄇㄈ"),      # Bopomofo
+    ({'boxdraw'}, "┌┬┐│", "┌┬┐│"),          # Box Drawing
+    ({'symbols', 'symbol'}, "→★♦♠", "→★♦♠"),  # Symbols
+]
+
+# Labels that imply ASCII coverage
+ASCII_LABELS = {'ascii', 'latin1', 'latinext'}
+
+def get_coverage_labels(font_name):
+    """
+    Get the set of name parts of a font, e.g. {'688', 'cyrillic', 'upper', '13'}
+    for '688-cyrillic_upper_13'. Subfont names can carry coverage too.
+    """
+    return set(re.split(r'[-_]', font_name.lower()))
+
 def get_demo_text_for_font(font_name):
     """Get appropriate demo text based on font's character coverage."""
-    name_lower = font_name.lower()
+    labels = get_coverage_labels(font_name)
+    is_uppercase = 'upper' in labels
 
     # Build demo text by combining sections based on character coverage
     sections = []
 
-    # Check for ASCII coverage (always show if present, or if uppercase-only)
-    has_ascii = 'ascii' in name_lower or 'latin' in name_lower
-    is_uppercase = '_upper_' in name_lower or name_lower.endswith('_upper')
-
-    # Start with ASCII section if present
-    if has_ascii or is_uppercase:
-        if is_uppercase:
-            sections.append("THE QUICK BROWN FOX")
-        else:
-            sections.append("Quick Brown Fox")
-
-    # Add Latin-1 section (4 characters with diacritics)
-    if 'latin1' in name_lower and not is_uppercase:
-        sections.append("ñäéö")
-
-    # Add Latin Extended section (4 characters)
-    if 'latinext' in name_lower:
-        sections.append("ŁŚŻš")
-
-    # Add Cyrillic section (4 characters)
-    if 'cyrillic' in name_lower:
-        if is_uppercase:
-            sections.append("БЫАГ")
-        else:
-            sections.append("быаг")
-
-    # Add Greek section (4 characters)
-    if 'greek' in name_lower:
-        sections.append("Γαβδ")
-
-    # Add Kana section (4 characters)
-    if 'kana' in name_lower or name_lower.startswith('mm2_kana'):
-        sections.append("いろは")
-
-    # Add Bopomofo section (4 characters)
-    if 'bopomofo' in name_lower:
-        sections.append("ㄅㄆㄇㄈ")
-
-    # Add Box Drawing section (4 characters)
-    if 'boxdraw' in name_lower:
-        sections.append("┌┬┐│")
+    # Start with ASCII section if present (always show if uppercase-only)
+    if is_uppercase:
+        sections.append("THE QUICK BROWN FOX")
+    elif labels & ASCII_LABELS:
+        sections.append("Quick Brown Fox")
 
-    # Add Symbols section (4 characters)
-    if 'symbols' in name_lower or 'symbol' in name_lower:
-        sections.append("→★♦♠")
+    for section_labels, upper_text, lower_text in DEMO_SECTIONS:
+        if labels & section_labels:
+            text = upper_text if is_uppercase else lower_text
+            if text:
+                sections.append(text)
 
     # If we built sections, join them with " | "
     if sections:
         return " | ".join(sections)
 
     # Fallback for fonts with no recognized coverage labels
-    if is_uppercase:
-        return "THE QUICK BROWN FOX"
     return "Quick Brown Fox"
 
-def render_font_with_monobit(yaff_path, text):
-    """Use monobit-banner to render text with a font."""
+# Largest number of texts rendered per worker task
+RENDER_CHUNK_SIZE = 32
+
+# Per-font info cache kept in the YAFF directory between runs
+SHOWCASE_CACHE_FILE = '.showcase_cache.json'
+
+# Characters drawn as black pixels in rendered ASCII art
+INK_CODEPOINTS = np.array([ord(c) for c in '█@#*'], dtype=np.uint32)
+# bytes.translate table turning ASCII art straight into 8-bit grayscale pixels
+ASCII_INK_TABLE = bytes(0 if chr(b) in '@#*' else 255 for b in range(256))
+
+@functools.lru_cache(maxsize=16)
+def load_font(yaff_path):
+    """Load the first font from a YAFF file with monobit (cached per process)."""
     try:
-        result = subprocess.run(
-            ['monobit-banner', '-f', yaff_path, text],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        if result.returncode == 0:
-            return result.stdout
+        font, *_ = monobit.load(yaff_path)
+        return font
+    except Exception:
         return None
-    except Exception as e:
+
+def render_text(font, text):
+    """Render text with a loaded monobit font as ASCII art, like monobit-banner."""
+    try:
+        return monobit.render_text(font, text).as_text(inklevels=' @')
+    except Exception:
         return None
 
-def ascii_to_image(ascii_text, font_name):
-    """Convert ASCII art to PIL Image with ultra-thin spacing."""
+def render_texts(yaff_path, texts):
+    """Render each of the texts with a font, reusing the worker's loaded copy."""
+    font = load_font(yaff_path)
+    if font is None:
+        return [None] * len(texts)
+    return [render_text(font, text) for text in texts]
+
+def render_fonts_concurrently(jobs):
+    """
+    Render many texts in worker processes, loading each font once per worker.
+
+    jobs: dict mapping a caller-chosen key to (yaff_path, text)
+    Returns: dict mapping the same keys to the rendered ASCII art (or None)
+    """
+    # Group jobs by font so each file is parsed once per worker
+    jobs_by_font = {}
+    for key, (yaff_path, text) in jobs.items():
+        jobs_by_font.setdefault(yaff_path, []).append((key, text))
+
+    # Rendering is pure Python, so fan out over long-lived worker processes.
+    # Fonts with many texts (the label font) are split into chunks so they
+    # spread over the pool; each worker keeps recently loaded fonts in memory.
+    renders = {}
+    with ProcessPoolExecutor() as executor:
+        futures = {}
+        for yaff_path, font_jobs in jobs_by_font.items():
+            for start in range(0, len(font_jobs), RENDER_CHUNK_SIZE):
+                chunk = font_jobs[start:start + RENDER_CHUNK_SIZE]
+                future = executor.submit(render_texts, yaff_path, [text for _, text in chunk])
+                futures[future] = chunk
+        for future, font_jobs in futures.items():
+            for (key, _), ascii_art in zip(font_jobs, future.result()):
+                renders[key] = ascii_art
+    return renders
+
+def ascii_art_shape(ascii_text):
+    """Get the (height, width) in pixels of ASCII art, or None if it is blank."""
     if not ascii_text or not ascii_text.strip():
         return None
 
-    lines = ascii_text.rstrip('\n').split('\n')
+    lines = ascii_text.rstrip('\n').splitlines()
     if not lines:
         return None
 
     # Calculate dimensions (1 pixel per character, ultra compact)
     height = len(lines)
-    width = max(len(line) for line in lines) if lines else 0
+    width = max(map(len, lines), default=0)
 
     if width == 0 or height == 0:
         return None
+    return height, width
 
-    # Create image: white background
-    img = Image.new('RGB', (width, height), 'white')
-    pixels = img.load()
+def ascii_to_image(ascii_text, font_name):
+    """Convert ASCII art to a grayscale pixel array with ultra-thin spacing."""
+    shape = ascii_art_shape(ascii_text)
+    if shape is None:
+        return None
+    height, width = shape
+    lines = ascii_text.rstrip('\n').splitlines()
+
+    padded = ''.join(line.ljust(width) for line in lines)
 
-    # Draw pixels (black for █ or @, white for spaces/dots)
-    for y, line in enumerate(lines):
-        for x, char in enumerate(line):
-            if char in ('█', '@', '#', '*'):
-                pixels[x, y] = (0, 0, 0)  # Black
+    # monobit output is plain ASCII: map each byte to a pixel in one C-level pass
+    if padded.isascii():
+        pixels = padded.encode('ascii').translate(ASCII_INK_TABLE)
+        return np.frombuffer(pixels, dtype=np.uint8).reshape(height, width)
 
-    return img
+    # Otherwise view the text as a grid of codepoints
+    codepoints = np.frombuffer(padded.encode('utf-32-le'), dtype=np.uint32).reshape(height, width)
+
+    # Black for █ or @, white for spaces/dots (8-bit grayscale is plenty here)
+    ink = np.isin(codepoints, INK_CODEPOINTS)
+    return np.where(ink, np.uint8(0), np.uint8(255))
 
 def find_smallest_variable_font(yaff_dir):
     return os.path.join(yaff_dir, 'hso_ascii_7.yaff')
 
-def get_alphabet_width(yaff_path):
-    """Calculate the width of rendering 'The Quick Brown Fox' with this font."""
+def get_alphabet_text(yaff_path):
+    """Get the 'The Quick Brown Fox' text to measure this font with."""
     name = os.path.basename(yaff_path).replace('.yaff', '')
-    name_lower = name.lower()
-    is_uppercase = '_upper_' in name_lower or name_lower.endswith('_upper')
-
-    if is_uppercase:
-        text_to_measure = "THE QUICK BROWN FOX"
-    else:
-        text_to_measure = "Quick Brown Fox"
+    if 'upper' in get_coverage_labels(name):
+        return "THE QUICK BROWN FOX"
+    return "Quick Brown Fox"
 
-    ascii_art = render_font_with_monobit(yaff_path, text_to_measure)
+def get_alphabet_width(ascii_art):
+    """Calculate the width of 'The Quick Brown Fox' as rendered by monobit."""
     if ascii_art:
-        lines = ascii_art.rstrip('\n').split('\n')
+        lines = ascii_art.rstrip('\n').splitlines()
         if lines:
-            return max(len(line) for line in lines)
+            return max(map(len, lines))
     return 0
 
-def extract_font_info(yaff_path):
+def height_from_name(name):
+    """Get font height from a canonical name like 'game_ascii_16x8', or None."""
+    for part in reversed(name.split('_')):
+        # Look for patterns like "16x8" or just "16"
+        if 'x' in part:
+            try:
+                return int(part.split('x')[0])
+            except ValueError:
+                pass
+        elif part.isdigit():
+            return int(part)
+    return None
+
+def height_from_file(yaff_path):
+    """Get font height from the pixel-size property in the YAFF header, or None."""
+    try:
+        with open(yaff_path, 'r', encoding='utf-8') as f:
+            content = f.read(2000)
+    except (OSError, UnicodeDecodeError):
+        return None
+
+    for line in content.split('\n'):
+        if line.startswith('pixel-size:'):
+            try:
+                return int(line.split(':')[1].strip())
+            except ValueError:
+                pass
+    return None
+
+def extract_font_info(yaff_path, alphabet_ascii):
     """Extract font height, whether it's monospace, and alphabet width from YAFF file."""
+    name = os.path.basename(yaff_path).replace('.yaff', '')
+
+    # Check if monospace - look for width in filename
+    is_monospace = 'x' in name.lower().split('_')[-1]  # e.g., "8x8"
+
+    # Filename is the canonical size; only read the file if that fails
+    height = height_from_name(name)
+    if height is None:
+        height = height_from_file(yaff_path)
+    if height is None:
+        height = 13  # Default fallback
+
+    # Get alphabet width for sorting
+    alphabet_width = get_alphabet_width(alphabet_ascii)
+
+    return height, is_monospace, alphabet_width
+
+def get_cache_key(yaff_path):
+    """Key a font's cache entry on its path, modification time and size."""
+    st = os.stat(yaff_path)
+    return f"{yaff_path}:{st.st_mtime_ns}:{st.st_size}"
+
+def get_label_cache_key(label_font_path):
+    """Key cached name labels on the label font's file state, or None if it is missing."""
     try:
-        # Parse filename FIRST (this is the canonical size)
-        name = os.path.basename(yaff_path).replace('.yaff', '')
-        parts = name.split('_')
-        height = None
-
-        for part in reversed(parts):
-            # Look for patterns like "16x8" or just "16"
-            if 'x' in part:
-                try:
-                    height = int(part.split('x')[0])
-                    break
-                except:
-                    pass
-            elif part.isdigit():
-                height = int(part)
-                break
-
-        # Only use pixel-size from file as fallback if filename parsing failed
-        if height is None:
-            with open(yaff_path, 'r', encoding='utf-8') as f:
-                content = f.read(2000)
-
-            for line in content.split('\n'):
-                if line.startswith('pixel-size:'):
-                    try:
-                        height = int(line.split(':')[1].strip())
-                        break
-                    except:
-                        pass
-
-        if height is None:
-            height = 13  # Default fallback
-
-        # Check if monospace - look for width in filename
-        name_lower = name.lower()
-        is_monospace = 'x' in name_lower.split('_')[-1]  # e.g., "8x8"
-
-        # Get alphabet width for sorting
-        alphabet_width = get_alphabet_width(yaff_path)
-
-        return height, is_monospace, alphabet_width
-    except:
-        return 13, False, 0
+        return f"label:{get_cache_key(label_font_path)}"
+    except OSError:
+        return None
+
+def load_showcase_cache(cache_path):
+    """Load cached [height, is_monospace, alphabet_width, alphabet_ascii] per font and label renders."""
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_showcase_cache(cache_path, cache):
+    """Write the font info cache, ignoring failures (e.g. read-only directory)."""
+    # Encode in one go with json.dumps, which uses the C encoder, then write
+    # once; json.dump streams many small chunks through the Python encoder
+    text = json.dumps(cache)
+    try:
+        with open(cache_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+    except OSError:
+        pass
 
 def create_font_showcase(yaff_dir, output_path, custom_demo_text=None):
     """Create a PNG showcasing all fonts with two-column layout."""
-    yaff_files = [f for f in os.listdir(yaff_dir) if f.endswith('.yaff')]
+    # One directory read; DirEntry already knows the file type
+    with os.scandir(yaff_dir) as entries:
+        yaff_files = [entry.name for entry in entries
+                      if entry.name.endswith('.yaff') and entry.is_file()]
 
     if not yaff_files:
         print("No YAFF files found!")
@@ -191,70 +275,106 @@ def create_font_showcase(yaff_dir, output_path, custom_demo_text=None):
 
     print(f"Found {len(yaff_files)} fonts")
 
+    # Find label font
+    label_font_path = find_smallest_variable_font(yaff_dir)
+    print(f"Using label font: {os.path.basename(label_font_path)}")
+
+    # Reuse font info and alphabet renders from earlier runs for unchanged files
+    cache_path = os.path.join(yaff_dir, SHOWCASE_CACHE_FILE)
+    cache = load_showcase_cache(cache_path)
+    cache_keys = {f: get_cache_key(os.path.join(yaff_dir, f)) for f in yaff_files}
+    # Stat the label font once and key each font's name label on it
+    label_font_key = get_label_cache_key(label_font_path)
+    label_keys = {
+        f: f"{label_font_key}:{f.replace('.yaff', '')}" if label_font_key is not None else None
+        for f in yaff_files
+    }
+
+    # Render everything up front: alphabet measurement, name label and demo text
+    print("Rendering fonts with monobit...")
+    jobs = {}
+    for yaff_file in yaff_files:
+        yaff_path = os.path.join(yaff_dir, yaff_file)
+        font_name = yaff_file.replace('.yaff', '')
+
+        # Get appropriate demo text for this font
+        if custom_demo_text:
+            demo_text = custom_demo_text
+        else:
+            demo_text = get_demo_text_for_font(font_name)
+
+        alphabet_text = get_alphabet_text(yaff_path)
+        if cache_keys[yaff_file] not in cache:
+            jobs[('alphabet', yaff_file)] = (yaff_path, alphabet_text)
+        if label_keys[yaff_file] not in cache:
+            jobs[('label', yaff_file)] = (label_font_path, font_name)
+        # Demo text is often the measurement text itself; reuse that render
+        if demo_text != alphabet_text:
+            jobs[('demo', yaff_file)] = (yaff_path, demo_text)
+    renders = render_fonts_concurrently(jobs)
+
     # Categorize and sort fonts
     print("Categorizing fonts and measuring alphabet widths...")
     font_info = []
+    new_cache = {}
     for yaff_file in yaff_files:
         yaff_path = os.path.join(yaff_dir, yaff_file)
-        height, is_monospace, alphabet_width = extract_font_info(yaff_path)
-        font_info.append((yaff_file, height, is_monospace, alphabet_width))
+        cache_key = cache_keys[yaff_file]
+        if cache_key in cache:
+            height, is_monospace, alphabet_width, alphabet_ascii = cache[cache_key]
+            renders[('alphabet', yaff_file)] = alphabet_ascii
+        else:
+            alphabet_ascii = renders[('alphabet', yaff_file)]
+            height, is_monospace, alphabet_width = extract_font_info(yaff_path, alphabet_ascii)
+        new_cache[cache_key] = [height, is_monospace, alphabet_width, alphabet_ascii]
+
+        # Name labels only change with the label font
+        label_key = label_keys[yaff_file]
+        if label_key in cache:
+            renders[('label', yaff_file)] = cache[label_key]
+        if label_key is not None:
+            new_cache[label_key] = renders[('label', yaff_file)]
+        font_info.append((is_monospace, alphabet_width, yaff_file, height))
         print(f"  {yaff_file}: height={height}, mono={is_monospace}, width={alphabet_width}")
+    save_showcase_cache(cache_path, new_cache)
 
     # Sort: variable width first (is_monospace=False), then by alphabet width, then by name
-    font_info.sort(key=lambda x: (x[2], x[3], x[0]))
-    yaff_files = [f[0] for f in font_info]
+    font_info.sort()
+    yaff_files = [f[2] for f in font_info]
 
     print(f"Sorted: variable-width fonts first, then monospace, by alphabet width")
 
-    # Find label font
-    label_font_path = find_smallest_variable_font(yaff_dir)
-    print(f"Using label font: {os.path.basename(label_font_path)}")
-
-    font_images = []
-    label_images = []
-    max_label_width = 0
+    # First pass: only measure the rendered text, so that each banner can be
+    # converted to pixels and dropped again while filling the canvas
+    rows = []
     max_font_width = 0
 
     for yaff_file in yaff_files:
-        yaff_path = os.path.join(yaff_dir, yaff_file)
         font_name = yaff_file.replace('.yaff', '')
 
-        # Render font name label with small font
-        label_ascii = render_font_with_monobit(label_font_path, font_name)
-        if label_ascii:
-            label_img = ascii_to_image(label_ascii, font_name)
-        else:
-            label_img = None
+        # Font name label rendered with small font
+        label_ascii = renders[('label', yaff_file)]
+        label_shape = ascii_art_shape(label_ascii)
 
-        # Get appropriate demo text for this font
-        if custom_demo_text:
-            demo_text = custom_demo_text
-        else:
-            demo_text = get_demo_text_for_font(font_name)
-
-        # Render with monobit
-        ascii_art = render_font_with_monobit(yaff_path, demo_text)
+        # Demo text rendered with this font
+        ascii_art = renders.get(('demo', yaff_file), renders[('alphabet', yaff_file)])
 
         if ascii_art:
-            # Convert to image
-            font_img = ascii_to_image(ascii_art, font_name)
-            if font_img:
-                font_images.append((font_name, font_img))
-                label_images.append(label_img)
-                if label_img:
-                    max_label_width = max(max_label_width, label_img.width)
-                max_font_width = max(max_font_width, font_img.width)
-                print(f"✓ {font_name}: {font_img.width}x{font_img.height}")
+            font_shape = ascii_art_shape(ascii_art)
+            if font_shape is not None:
+                rows.append((font_name, label_ascii, label_shape, ascii_art, font_shape))
+                max_font_width = max(max_font_width, font_shape[1])
+                print(f"✓ {font_name}: {font_shape[1]}x{font_shape[0]}")
             else:
                 print(f"✗ {font_name}: Failed to convert ASCII")
         else:
             print(f"✗ {font_name}: Failed to render")
 
-    if not font_images:
+    if not rows:
         print("No fonts could be rendered!")
         return
 
-    print(f"\nCreating two-column showcase with {len(font_images)} fonts...")
+    print(f"\nCreating two-column showcase with {len(rows)} fonts...")
 
     # Add spacing between columns
     column_spacing = 4
@@ -263,43 +383,42 @@ def create_font_showcase(yaff_dir, output_path, custom_demo_text=None):
     # Calculate dimensions
     total_width = label_col_width + column_spacing + max_font_width
 
-    # Calculate total height (use max of label and font height for each row, 1px spacing)
-    row_heights = []
-    for i, (font_name, font_img) in enumerate(font_images):
-        label_img = label_images[i]
-        label_height = label_img.height if label_img else 0
-        row_height = max(font_img.height, label_height)
-        row_heights.append(row_height)
-
-    total_height = sum(row_heights) + len(row_heights)  # +1px spacing per row
-
-    # Create final image
-    showcase = Image.new('RGB', (total_width, total_height), 'white')
-
-    # Paste each font with its label
-    y_offset = 0
-    for i, (font_name, font_img) in enumerate(font_images):
-        label_img = label_images[i]
-        row_height = row_heights[i]
-
-        # Paste label (vertically centered in row)
-        if label_img:
-            if label_img.width > label_col_width:
-                label_img = label_img.crop((0, 0, label_col_width, label_img.height))
-            label_y = y_offset + (row_height - label_img.height) // 2
-            showcase.paste(label_img, (0, label_y))
-
-        # Paste font sample (vertically centered in row)
-        font_y = y_offset + (row_height - font_img.height) // 2
-        showcase.paste(font_img, (label_col_width + column_spacing, font_y))
-
-        y_offset += row_height + 1
-
-    # Save
+    # Calculate row heights (max of label and font height for each row) and
+    # the top of each row, with 1px spacing between rows
+    row_heights = np.array([
+        max(font_shape[0], label_shape[0] if label_shape else 0)
+        for _, _, label_shape, _, font_shape in rows
+    ])
+    y_offsets = np.cumsum(row_heights + 1) - (row_heights + 1)
+    total_height = int(row_heights.sum()) + len(row_heights)
+
+    # Second pass: convert each banner and copy it into a single white canvas
+    canvas = np.full((total_height, total_width), 255, np.uint8)
+
+    for (font_name, label_ascii, label_shape, ascii_art, font_shape), row_height, y_offset in zip(
+            rows, row_heights, y_offsets):
+        # Copy label (vertically centered in row)
+        if label_shape:
+            label_img = ascii_to_image(label_ascii, font_name)[:, :label_col_width]
+            label_height, label_width = label_img.shape
+            label_y = y_offset + (row_height - label_height) // 2
+            canvas[label_y:label_y + label_height, :label_width] = label_img
+
+        # Copy font sample (vertically centered in row)
+        font_img = ascii_to_image(ascii_art, font_name)
+        font_height, font_width = font_img.shape
+        font_x = label_col_width + column_spacing
+        font_y = y_offset + (row_height - font_height) // 2
+        canvas[font_y:font_y + font_height, font_x:font_x + font_width] = font_img
+
+    # Save as a 1-bit PNG: the canvas is pure black and white, and packing 8
+    # pixels per byte leaves deflate an eighth of the data to compress
+    packed = np.packbits(canvas != 0, axis=1)
+    showcase = Image.frombytes('1', (total_width, total_height), packed.tobytes())
     showcase.save(output_path)
     print(f"\n✓ Saved to {output_path}")
     print(f"  Dimensions: {showcase.width}x{showcase.height}")
-    print(f"  Fonts: {len(font_images)}")
+    print(f"  Fonts: {len(rows)}")
 
 def main():
     yaff_dir = 'yaff'
@@ -2,7 +2,7 @@
 """
 Convert Death Generator JSON font definition + PNG sprite sheet to YAFF format.
 
-Usage: python deathgenerator2yaff.py <game_dir> <output_dir>
+Usage: python deathgenerator2yaff.py [--jobs N] <game_dir> <output_dir>
 Example: python deathgenerator2yaff.py games/win95 yaff
 """
 
@@ -10,8 +10,10 @@ import sys
 import os
 import json
 import re
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 from PIL import Image
-from collections import OrderedDict
 
 # Font type detection overrides
 # Map game name to forced font type ('monochrome_solid', 'outlined', 'shadowed',
@@ -42,6 +44,23 @@ FONT_TYPE_OVERRIDES = {
     'wea': 'chromatic_bright',  # INVERTED: Bright text on dark background
 }
 
+# (remove_shadow, remove_outline) flags set by a font type override
+_OVERRIDE_FLAGS = {
+    'antialiased': (False, False),
+    'unknown': (False, False),
+    'chromatic_bright': (False, False),
+    'shadowed': (True, False),
+    'chromatic_shadowed': (True, False),
+    'chromatic_shadowed_bright': (True, False),
+    'outlined': (False, True),
+    'chromatic_outlined': (False, True),
+}
+# Subfont overrides only clear the flags for antialiased/unknown types
+_SUBFONT_OVERRIDE_FLAGS = {
+    'antialiased': (False, False),
+    'unknown': (False, False),
+}
+
 # Special character mappings for Windows codepage to Unicode
 CP1252_TO_UNICODE = {
     145: 0x2018,  # LEFT SINGLE QUOTATION MARK
@@ -49,9 +68,51 @@ CP1252_TO_UNICODE = {
     # Add more Windows-1252 specific mappings if needed
 }
 
+# Glyph comment labels for printable ASCII; other characters use U+XXXX
+_ASCII_LABELS = {cp: chr(cp) for cp in range(32, 127)}
+
+# JSON keys that hold font properties rather than character definitions
+_METADATA_KEYS = frozenset({
+    'height', 'origin', 'scale', 'wrap-width', 'dynamic-size', 'border',
+    'overlays', 'hooks', 'subfonts', 'notes', 'case-fold', 'null-character',
+    'default', 'explicit-origins', 'us-font-aliases', 'soviet-font-aliases',
+})
+
+# Unicode blocks counted for coverage labels, in codepoint order: (name, first, last)
+_COVERAGE_BLOCKS = (
+    ('ascii', 0x20, 0x7E),
+    ('latin1', 0xA0, 0xFF),
+    ('latinext', 0x0100, 0x024F),
+    ('greek', 0x0370, 0x03FF),
+    ('cyrillic', 0x0400, 0x04FF),
+    ('arrows', 0x2190, 0x21FF),
+    ('math', 0x2200, 0x22FF),  # Mathematical Operators
+    ('technical', 0x2300, 0x23FF),  # Miscellaneous Technical
+    ('boxdraw', 0x2500, 0x257F),
+    ('geometric', 0x25A0, 0x25FF),  # Geometric Shapes
+    ('hiragana', 0x3040, 0x309F),
+    ('katakana', 0x30A0, 0x30FF),
+    ('bopomofo', 0x3100, 0x312F),
+)
+# Alternating block start and end+1 edges for np.searchsorted
+_COVERAGE_EDGES = np.array([edge for _, first, last in _COVERAGE_BLOCKS for edge in (first, last + 1)])
+
+# Filename suffix per combination of coverage labels, e.g. ('ascii', 'cyrillic') -> '_ascii_cyrillic'
+_LABEL_SUFFIXES = {(): ""}
+
 # Cache for game metadata from generators.js
 _GAME_METADATA_CACHE = None
 
+# (sheet, sheet_masks, sample_patterns) of a subfont worker process
+_SUBFONT_WORKER_STATE = None
+
+# Patterns for game entries in generators.js, e.g. 'game_id':{ 'title':'...', ... }
+_GAME_PATTERN = re.compile(r"'(\w+)':\s*\{([^}]+)\}", re.DOTALL)
+_TITLE_PATTERN = re.compile(r"'title':\s*'([^']+)'")
+_YEAR_PATTERN = re.compile(r"'year':\s*(\d+)")
+_SOURCE_PATTERN = re.compile(r"'source':\s*'([^']+)'")
+_PLATFORM_PATTERN = re.compile(r"'platform':\s*'([^']+)'")
+
 def load_game_metadata():
     """Load game metadata from js/generators.js"""
     global _GAME_METADATA_CACHE
@@ -67,30 +128,26 @@ def load_game_metadata():
             content = f.read()
 
         # Parse each game entry
-        # Pattern: 'game_id':{ ... }
-        game_pattern = r"'(\w+)':\s*\{([^}]+)\}"
-        game_matches = re.findall(game_pattern, content, re.DOTALL)
-
-        for game_id, game_block in game_matches:
+        for game_id, game_block in _GAME_PATTERN.findall(content):
             metadata = {}
 
             # Extract title
-            title_match = re.search(r"'title':\s*'([^']+)'", game_block)
+            title_match = _TITLE_PATTERN.search(game_block)
             if title_match:
                 metadata['title'] = title_match.group(1)
 
             # Extract year
-            year_match = re.search(r"'year':\s*(\d+)", game_block)
+            year_match = _YEAR_PATTERN.search(game_block)
             if year_match:
                 metadata['year'] = int(year_match.group(1))
 
             # Extract source (publisher/developer)
-            source_match = re.search(r"'source':\s*'([^']+)'", game_block)
+            source_match = _SOURCE_PATTERN.search(game_block)
             if source_match:
                 metadata['source'] = source_match.group(1)
 
             # Extract platform
-            platform_match = re.search(r"'platform':\s*'([^']+)'", game_block)
+            platform_match = _PLATFORM_PATTERN.search(game_block)
             if platform_match:
                 metadata['platform'] = platform_match.group(1)
 
@@ -102,6 +159,26 @@ def load_game_metadata():
 
     return _GAME_METADATA_CACHE
 
+def set_game_metadata(metadata):
+    """Use game metadata loaded elsewhere, e.g. by a parent process, instead of reading generators.js."""
+    global _GAME_METADATA_CACHE
+    _GAME_METADATA_CACHE = metadata
+
+def _apply_override(pattern, override_type, override_flags):
+    """
+    Force a detected font pattern to an override type, setting its
+    shadow/outline removal flags from the given flag table. Other pattern
+    data (monospace, dimensions, etc.) is preserved.
+
+    Returns: the originally detected type
+    """
+    original_type = pattern['type']
+    pattern['type'] = override_type
+    flags = override_flags.get(override_type)
+    if flags:
+        pattern['remove_shadow'], pattern['remove_outline'] = flags
+    return original_type
+
 def get_unicode_codepoint(decimal_code):
     """Convert decimal character code to Unicode codepoint."""
     if decimal_code in CP1252_TO_UNICODE:
@@ -109,7 +186,22 @@ def get_unicode_codepoint(decimal_code):
     # For ASCII and Latin-1, the values are the same
     return decimal_code
 
-def detect_spatial_pattern(image, x, y, w, h):
+def _brightness(rgba):
+    """Get the brightest of the R, G and B channels for each pixel."""
+    # Band by band is much faster than a max() reduction over the short last axis
+    return np.maximum(np.maximum(rgba[..., 0], rgba[..., 1]), rgba[..., 2])
+
+def _clip_to_sheet(array, x, y, w, h):
+    """
+    Slice a glyph box out of a sheet-sized array, clipped to the sheet's bounds.
+
+    Returns: (tile, top, left) with the tile's position on the sheet
+    """
+    top, left = max(y, 0), max(x, 0)
+    bottom, right = min(y + h, array.shape[0]), min(x + w, array.shape[1])
+    return array[top:max(bottom, top), left:max(right, left)], top, left
+
+def detect_spatial_pattern(sheet, x, y, w, h):
     """
     Analyze spatial distribution of bright vs dark pixels to distinguish:
     - Shadow: bright/dark pixels offset in one direction
@@ -117,40 +209,21 @@ def detect_spatial_pattern(image, x, y, w, h):
 
     Returns: 'shadow', 'outline', or 'unknown'
     """
-    # Convert to RGBA
-    if image.mode != 'RGBA':
-        img_rgba = image.convert('RGBA')
-    else:
-        img_rgba = image
+    # Clip to the sheet and collect pixel positions by brightness
+    tile, top, left = _clip_to_sheet(sheet, x, y, w, h)
 
-    # Collect pixel positions by brightness
-    bright_positions = []
-    dark_positions = []
+    opaque = tile[..., 3] > 100  # Opaque enough
+    brightness = _brightness(tile)
+    origin = (top - y, left - x)
+    bright_positions = np.argwhere(opaque & (brightness > 150)) + origin
+    dark_positions = np.argwhere(opaque & (brightness < 100)) + origin
 
-    for py in range(y, min(y + h, img_rgba.size[1])):
-        for px in range(x, min(x + w, img_rgba.size[0])):
-            try:
-                r, g, b, a = img_rgba.getpixel((px, py))
-                if a > 100:  # Opaque enough
-                    brightness = max(r, g, b)
-                    local_x = px - x
-                    local_y = py - y
-
-                    if brightness > 150:
-                        bright_positions.append((local_x, local_y))
-                    elif brightness < 100:
-                        dark_positions.append((local_x, local_y))
-            except:
-                pass
-
-    if not bright_positions or not dark_positions:
+    if len(bright_positions) == 0 or len(dark_positions) == 0:
         return 'unknown'
 
     # Calculate average positions
-    bright_avg_x = sum(x for x, y in bright_positions) / len(bright_positions)
-    bright_avg_y = sum(y for x, y in bright_positions) / len(bright_positions)
-    dark_avg_x = sum(x for x, y in dark_positions) / len(dark_positions)
-    dark_avg_y = sum(y for x, y in dark_positions) / len(dark_positions)
+    bright_avg_y, bright_avg_x = bright_positions.mean(axis=0)
+    dark_avg_y, dark_avg_x = dark_positions.mean(axis=0)
 
     # Calculate offset vector
     offset_x = bright_avg_x - dark_avg_x
@@ -172,12 +245,13 @@ def detect_spatial_pattern(image, x, y, w, h):
     else:
         return 'unknown'
 
-def analyze_font_pattern(image, font_data, height):
+def analyze_font_pattern(sheet, font_data, height, sample_patterns=None):
     """
     Analyze font color pattern to detect: outlined, antialiased, shadowed, multi-color.
     Also detects if font is monospace (fixed-width).
 
     Returns: dict with 'type', 'is_monospace', and metrics
+    sample_patterns: Optional dict to share sample classifications between fonts of one sheet
     """
     # Get default values
     defaults = font_data.get('default', {})
@@ -186,26 +260,35 @@ def analyze_font_pattern(image, font_data, height):
     default_w = defaults.get('w', None)
 
     # Check if monospace and collect dimensions
-    metadata_keys = {'height', 'origin', 'scale', 'wrap-width', 'dynamic-size', 'border',
-                     'overlays', 'hooks', 'subfonts', 'notes', 'case-fold', 'null-character',
-                     'default', 'explicit-origins', 'us-font-aliases', 'soviet-font-aliases'}
-
     widths = []
     heights = []
     is_monospace = False
 
-    # Collect all widths and heights
+    # Sample character candidates: A, a, 0, or else the first positioned character
+    sample_chars = ['65', '97', '48']
+    samples = {}
+    first_char = None
+
+    # Collect all widths and heights and the sample candidates in one pass
     for key, value in font_data.items():
-        if key not in metadata_keys and isinstance(value, dict):
-            if 'w' in value:
-                widths.append(value['w'])
-            elif default_w is not None:
-                widths.append(default_w)
-
-            if 'h' in value:
-                heights.append(value['h'])
-            else:
-                heights.append(default_h)
+        if key in _METADATA_KEYS or not isinstance(value, dict):
+            continue
+
+        if 'w' in value:
+            widths.append(value['w'])
+        elif default_w is not None:
+            widths.append(default_w)
+
+        if 'h' in value:
+            heights.append(value['h'])
+        else:
+            heights.append(default_h)
+
+        if 'x' in value:
+            if first_char is None:
+                first_char = value
+            if key in sample_chars:
+                samples[key] = value
 
     # Determine monospace
     if default_w is not None:
@@ -218,24 +301,7 @@ def analyze_font_pattern(image, font_data, height):
     max_height = max(heights) if heights else height
 
     # Find a sample character to analyze
-    metadata_keys = {'height', 'origin', 'scale', 'wrap-width', 'dynamic-size', 'border',
-                     'overlays', 'hooks', 'subfonts', 'notes', 'case-fold', 'null-character',
-                     'default', 'explicit-origins', 'us-font-aliases', 'soviet-font-aliases'}
-
-    sample_chars = ['65', '97', '48']  # A, a, 0
-    char_data = None
-
-    for char_code in sample_chars:
-        if char_code in font_data and isinstance(font_data[char_code], dict) and 'x' in font_data[char_code]:
-            char_data = font_data[char_code]
-            break
-
-    if not char_data:
-        # Find any character
-        for key, val in font_data.items():
-            if key not in metadata_keys and isinstance(val, dict) and 'x' in val:
-                char_data = val
-                break
+    char_data = next((samples[c] for c in sample_chars if c in samples), first_char)
 
     if not char_data:
         return {
@@ -257,83 +323,92 @@ def analyze_font_pattern(image, font_data, height):
         w = height
     h = char_data.get('h', default_h)
 
-    # Convert to RGBA
-    if image.mode != 'RGBA':
-        img_rgba = image.convert('RGBA')
+    # Classify the sample glyph; fonts of one sheet often share it
+    box = (x, y, w, h)
+    if sample_patterns is not None and box in sample_patterns:
+        classification = sample_patterns[box]
     else:
-        img_rgba = image
+        classification = _classify_sample(sheet, x, y, w, h)
+        if sample_patterns is not None:
+            sample_patterns[box] = classification
 
-    # Collect pixels
-    pixels = []
-    for py in range(y, min(y + h, img_rgba.size[1])):
-        for px in range(x, min(x + w, img_rgba.size[0])):
-            try:
-                r, g, b, a = img_rgba.getpixel((px, py))
-                if a > 10:  # Not fully transparent
-                    pixels.append((r, g, b, a))
-            except:
-                pass
-
-    if not pixels:
+    if classification is None:
         return {'type': 'unknown', 'skip': False}
 
-    # Analyze colors
-    colors = set((r, g, b) for r, g, b, a in pixels)
+    return {
+        **classification,
+        'is_monospace': is_monospace,
+        'max_width': max_width,
+        'max_height': max_height
+    }
+
+def _classify_sample(sheet, x, y, w, h):
+    """
+    Classify the colors of a sample glyph box: outlined, antialiased,
+    shadowed, multi-color, etc.
+
+    Returns: dict with 'type', 'skip' and type-specific metrics,
+    or None if the box has no visible pixels
+    """
+    # Collect pixels of the sample glyph (clipped to the sheet) as RGBA rows
+    tile, _, _ = _clip_to_sheet(sheet, x, y, w, h)
+    tile = tile.reshape(-1, 4)
+    pixels = tile[tile[:, 3] > 10]  # Not fully transparent
+
+    if len(pixels) == 0:
+        return None
+
+    # Analyze colors: pack RGB into one integer per pixel so that the unique
+    # colors come from a flat sort rather than a row-wise one
+    rgb = pixels[:, :3].astype(np.uint32)
+    colors = np.unique((rgb[:, 0] << 16) | (rgb[:, 1] << 8) | rgb[:, 2])
 
     # Categorize pixels
-    white_pixels = sum(1 for r, g, b, a in pixels if r > 200 and g > 200 and b > 200 and a > 200)
-    black_pixels = sum(1 for r, g, b, a in pixels if r < 50 and g < 50 and b < 50 and a > 200)
-    gray_pixels = sum(1 for r, g, b, a in pixels if 50 <= r <= 200 and 50 <= g <= 200 and 50 <= b <= 200 and abs(r-g) < 30 and abs(g-b) < 30 and a > 200)
-    semi_transparent = sum(1 for r, g, b, a in pixels if 10 < a < 240)
+    r, g, b, a = pixels.astype(np.int16).T
+    brightness = _brightness(pixels)
+    opaque = a > 200
+    white_pixels = int(np.count_nonzero(opaque & (r > 200) & (g > 200) & (b > 200)))
+    black_pixels = int(np.count_nonzero(opaque & (r < 50) & (g < 50) & (b < 50)))
+    gray_pixels = int(np.count_nonzero(
+        opaque & (r >= 50) & (r <= 200) & (g >= 50) & (g <= 200) & (b >= 50) & (b <= 200)
+        & (np.abs(r - g) < 30) & (np.abs(g - b) < 30)))
+    semi_transparent = int(np.count_nonzero(a < 240))
     colored_pixels = len(pixels) - white_pixels - black_pixels - gray_pixels
 
     total = len(pixels)
 
     # Classification
-    # Check if colors are actually chromatic (not just grayscale variations)
-    chromatic_pixels = 0
-    for r, g, b, a in pixels:
-        if a > 200:
-            # Check if this is a chromatic color (RGB channels differ significantly)
-            max_diff = max(abs(r-g), abs(g-b), abs(r-b))
-            if max_diff > 40:  # Significant color difference between channels
-                chromatic_pixels += 1
+    # Check if colors are actually chromatic (not just grayscale variations):
+    # the RGB channels differ significantly
+    chromatic_pixels = int(np.count_nonzero(opaque & (brightness - pixels[:, :3].min(axis=1) > 40)))
 
     # Check if this is a single-hue font (chromatic outlined/shadowed)
     # All pixels should have the same dominant color channel
     if chromatic_pixels > total * 0.1:
-        # Find dominant channel for each pixel
-        dominant_channels = []
-        for r, g, b, a in pixels:
-            if a > 200:
-                max_val = max(r, g, b)
-                if max_val > 0:
-                    if r == max_val:
-                        dominant_channels.append('R')
-                    elif g == max_val:
-                        dominant_channels.append('G')
-                    else:
-                        dominant_channels.append('B')
+        # Find dominant channel for each pixel (first of R, G, B on ties)
+        lit = opaque & (brightness > 0)
+        lit_count = int(np.count_nonzero(lit))
 
         # If >80% have same dominant channel, it's single-hue
-        if dominant_channels:
-            from collections import Counter
-            channel_counts = Counter(dominant_channels)
-            most_common_channel, count = channel_counts.most_common(1)[0]
+        if lit_count:
+            channel_counts = np.bincount(pixels[lit, :3].argmax(axis=1), minlength=3)
+            dominant = int(channel_counts.argmax())
+            most_common_channel = 'RGB'[dominant]
+            count = int(channel_counts[dominant])
 
-            if count / len(dominant_channels) > 0.8:
+            if count / lit_count > 0.8:
                 # Single-hue chromatic font (e.g., red with dark red outline)
                 # Treat like outlined/shadowed font
 
                 # Find bright vs dark pixels
-                bright_pixels = sum(1 for r, g, b, a in pixels if a > 200 and max(r, g, b) > 150)
-                dark_pixels = sum(1 for r, g, b, a in pixels if a > 200 and max(r, g, b) <= 150)
+                bright_pixels = int(np.count_nonzero(opaque & (brightness > 150)))
+                dark_pixels = int(np.count_nonzero(opaque & (brightness <= 150)))
 
                 if bright_pixels > 0 and dark_pixels > 0:
                     dark_ratio = dark_pixels / total
 
                     # Use spatial analysis to distinguish shadow from outline
-                    spatial_pattern = detect_spatial_pattern(image, x, y, w, h)
+                    spatial_pattern = detect_spatial_pattern(sheet, x, y, w, h)
 
                     if spatial_pattern == 'shadow':
                         # Spatial analysis confirms shadow pattern
@@ -342,10 +417,7 @@ def analyze_font_pattern(image, font_data, height):
                             'skip': False,
                             'dark_ratio': dark_ratio,
                             'remove_shadow': True,
-                            'dominant_channel': most_common_channel,
-                            'is_monospace': is_monospace,
-                            'max_width': max_width,
-                            'max_height': max_height
+                            'dominant_channel': most_common_channel
                         }
                     elif spatial_pattern == 'outline':
                         # Spatial analysis confirms outline pattern
@@ -355,10 +427,7 @@ def analyze_font_pattern(image, font_data, height):
                             'bright_ratio': bright_pixels / total,
                             'dark_ratio': dark_ratio,
                             'remove_outline': True,
-                            'dominant_channel': most_common_channel,
-                            'is_monospace': is_monospace,
-                            'max_width': max_width,
-                            'max_height': max_height
+                            'dominant_channel': most_common_channel
                         }
                     else:
                         # Fallback to ratio-based heuristic if spatial is unclear
@@ -369,10 +438,7 @@ def analyze_font_pattern(image, font_data, height):
                                 'skip': False,
                                 'dark_ratio': dark_ratio,
                                 'remove_shadow': True,
-                                'dominant_channel': most_common_channel,
-                                'is_monospace': is_monospace,
-                                'max_width': max_width,
-                                'max_height': max_height
+                                'dominant_channel': most_common_channel
                             }
                         else:
                             # Significant dark = outline
@@ -382,20 +448,14 @@ def analyze_font_pattern(image, font_data, height):
                                 'bright_ratio': bright_pixels / total,
                                 'dark_ratio': dark_ratio,
                                 'remove_outline': True,
-                                'dominant_channel': most_common_channel,
-                                'is_monospace': is_monospace,
-                                'max_width': max_width,
-                                'max_height': max_height
+                                'dominant_channel': most_common_channel
                             }
 
         # Multi-hue - truly multi-color, skip
         return {
             'type': 'multi_color',
             'skip': True,
-            'unique_colors': len(colors),
-            'is_monospace': is_monospace,
-            'max_width': max_width,
-            'max_height': max_height
+            'unique_colors': len(colors)
         }
 
     # Outlined (white + black, both significant)
@@ -408,10 +468,7 @@ def analyze_font_pattern(image, font_data, height):
                 'skip': False,
                 'white_ratio': white_ratio,
                 'black_ratio': black_ratio,
-                'remove_outline': True,
-                'is_monospace': is_monospace,
-                'max_width': max_width,
-                'max_height': max_height
+                'remove_outline': True
             }
 
     # Shadowed (small amount of black + main color)
@@ -422,162 +479,140 @@ def analyze_font_pattern(image, font_data, height):
                 'type': 'shadowed',
                 'skip': False,
                 'black_ratio': black_ratio,
-                'remove_shadow': True,
-                'is_monospace': is_monospace,
-                'max_width': max_width,
-                'max_height': max_height
+                'remove_shadow': True
             }
 
     # Antialiased (grayscale or semi-transparent)
     if semi_transparent > 0 or gray_pixels > total * 0.2:
         return {
             'type': 'antialiased',
-            'skip': False,
-            'is_monospace': is_monospace,
-            'max_width': max_width,
-            'max_height': max_height
+            'skip': False
         }
 
     # Monochrome solid
     if len(colors) == 1:
         return {
             'type': 'monochrome_solid',
-            'skip': False,
-            'is_monospace': is_monospace,
-            'max_width': max_width,
-            'max_height': max_height
+            'skip': False
         }
 
     return {
         'type': 'unknown',
-        'skip': False,
-        'is_monospace': is_monospace,
-        'max_width': max_width,
-        'max_height': max_height
+        'skip': False
     }
 
-def extract_glyph_pixels(image, x, y, width, height, threshold=128, pattern=None):
-    """
-    Extract a glyph from the sprite sheet and convert to YAFF format.
+# bytes.translate table from glyph row codes to YAFF characters:
+# 0/1 uninked/inked pixel, 2 indent, 3 line end
+_YAFF_ROW_TABLE = b'.@ \n' + bytes(252)
+
+# Ink tests on an RGBA array, picked once per font by _ink_rule
+def _bright_ink(rgba):
+    return _brightness(rgba) > 150
+
+def _dark_ink(rgba):
+    return _brightness(rgba) < 100
+
+def _non_black_ink(rgba):
+    return (rgba[..., 0] >= 50) | (rgba[..., 1] >= 50) | (rgba[..., 2] >= 50)
 
-    Returns a list of strings, each representing a row of pixels.
-    '@' = inked pixel (opaque), '.' = uninked pixel (transparent/white)
+def _non_highlight_ink(rgba):
+    return _brightness(rgba) <= 180
 
-    pattern: Optional dict with 'remove_outline' or 'remove_shadow' flags
+def _ink_rule(pattern):
     """
-    if width == 0 or height == 0:
-        return ["-"]  # Empty glyph notation
+    Pick the color test that separates glyph ink from outline, shadow or highlights.
 
-    # Convert to RGBA to handle all image modes consistently
-    if image.mode != 'RGBA':
-        image = image.convert('RGBA')
+    Returns: one of the ink test functions, or None to keep every opaque pixel
+    """
+    if pattern and pattern.get('remove_outline'):
+        # For outlined fonts
+        if pattern['type'] == 'chromatic_outlined':
+            # Chromatic outlined: bright pixels are foreground, dark are outline
+            return _bright_ink
+        # White/black outlined: black pixels are the outline, white and
+        # other colors are kept
+        return _non_black_ink
+
+    if pattern and pattern.get('remove_shadow'):
+        # For shadowed fonts
+        if pattern['type'] == 'chromatic_shadowed_bright':
+            # Chromatic shadowed (bright foreground variant): bright pixels are text
+            return _bright_ink
+        if pattern['type'] == 'chromatic_shadowed':
+            # Chromatic shadowed: Need to determine which is foreground
+            # Check dark_ratio: if high, dark is likely foreground
+            if pattern.get('dark_ratio', 0) >= 0.4:
+                # High dark ratio: dark pixels are foreground (like khcom)
+                return _dark_ink
+            # Low dark ratio: bright pixels are foreground
+            return _bright_ink
+        # Grayscale shadowed: non-black = main glyph
+        return _non_black_ink
+
+    if pattern and pattern['type'] == 'chromatic_bright':
+        # Chromatic bright: remove very bright pixels (highlights/shine)
+        # Keep mid-tone and darker pixels as the main text
+        return _non_highlight_ink
+
+    # Default: any opaque pixel is inked
+    return None
+
+def _ink_mask(rgba, threshold, rule):
+    """
+    Classify an RGBA pixel array as glyph ink with a rule from _ink_rule.
 
-    rows = []
-    for py in range(height):
-        row = ""
-        for px in range(width):
-            pixel_x = x + px
-            pixel_y = y + py
+    Returns: boolean array with the array's height and width
+    """
+    opaque = rgba[..., 3] > threshold
+    if rule is None:
+        return opaque
+    return opaque & rule(rgba)
 
-            # Get pixel in RGBA format
-            try:
-                r, g, b, a = image.getpixel((pixel_x, pixel_y))
-
-                # Apply pattern-specific filtering
-                is_inked = False
-
-                if pattern and pattern.get('remove_outline'):
-                    # For outlined fonts
-                    if a > threshold:
-                        if pattern['type'] == 'chromatic_outlined':
-                            # Chromatic outlined: bright pixels are foreground, dark are outline
-                            if max(r, g, b) > 150:
-                                is_inked = True
-                            else:
-                                is_inked = False
-                        else:
-                            # White/black outlined: only white pixels are foreground
-                            if r > 200 and g > 200 and b > 200:
-                                is_inked = True
-                            elif r < 50 and g < 50 and b < 50:
-                                is_inked = False
-                            else:
-                                # Other colors, keep
-                                is_inked = True
-
-                elif pattern and pattern.get('remove_shadow'):
-                    # For shadowed fonts
-                    if a > threshold:
-                        if pattern['type'] == 'chromatic_shadowed_bright':
-                            # Chromatic shadowed (bright foreground variant): bright pixels are text
-                            brightness = max(r, g, b)
-                            if brightness > 150:
-                                is_inked = True
-                            else:
-                                is_inked = False
-                        elif pattern['type'] == 'chromatic_shadowed':
-                            # Chromatic shadowed: Need to determine which is foreground
-                            # Check dark_ratio: if high, dark is likely foreground
-                            dark_ratio = pattern.get('dark_ratio', 0)
-                            brightness = max(r, g, b)
-
-                            if dark_ratio >= 0.4:
-                                # High dark ratio: dark pixels are foreground (like khcom)
-                                if brightness < 100:
-                                    is_inked = True
-                                else:
-                                    is_inked = False
-                            else:
-                                # Low dark ratio: bright pixels are foreground
-                                if brightness > 150:
-                                    is_inked = True
-                                else:
-                                    is_inked = False
-                        else:
-                            # Grayscale shadowed: non-black = main glyph
-                            if r < 50 and g < 50 and b < 50:
-                                is_inked = False
-                            else:
-                                is_inked = True
-
-                elif pattern and pattern['type'] == 'chromatic_bright':
-                    # Chromatic bright: remove very bright pixels (highlights/shine)
-                    # Keep mid-tone and darker pixels as the main text
-                    # Note: "is_inked = True" means this pixel is PART OF the glyph (the text)
-                    if a > threshold:
-                        brightness = max(r, g, b)
-                        if brightness > 180:
-                            is_inked = False  # Very bright pixels are highlights (removed)
-                        else:
-                            is_inked = True  # Mid/dark pixels ARE the text
+def _glyph_ink(sheet_mask, x, y, width, height):
+    """
+    Cut a glyph box out of a sheet's ink mask, padding it where it runs off the sheet.
 
-                else:
-                    # Default: any opaque pixel is inked
-                    if a > threshold:
-                        is_inked = True
+    Returns: (height, width) boolean ink array, uninked outside the sheet
+    """
+    # Clip the glyph box to the sheet; pixels outside it stay uninked
+    ink, top, left = _clip_to_sheet(sheet_mask, x, y, width, height)
 
-                row += "@" if is_inked else "."
+    if ink.shape != (height, width):
+        # Glyph box runs off the sheet: place the visible part on a blank glyph
+        visible = ink
+        ink = np.zeros((height, width), dtype=bool)
+        ink[top - y:top - y + visible.shape[0], left - x:left - x + visible.shape[1]] = visible
+    return ink
 
-            except:
-                row += "."  # Default to uninked if error
+def _glyph_rows(sheet_mask, x, y, width, height):
+    """
+    Extract a glyph from the sprite sheet's ink mask and convert to YAFF format.
+
+    Returns: ASCII bytes with one line per pixel row, indented by four spaces,
+    e.g. b"    .@@.\n"; '@' = inked pixel (opaque), '.' = uninked pixel
+    (transparent/white). An empty glyph is the single line b"    -\n".
 
-        rows.append(row)
+    sheet_mask: Boolean ink mask of the whole sheet, see _ink_mask
+    """
+    if width == 0 or height == 0:
+        return b"    -\n"
 
-    return rows
+    # Lay out indent, ink and line end codes per row, then translate them all at once
+    rows = np.empty((height, width + 5), dtype=np.uint8)
+    rows[:, :4] = 2
+    rows[:, 4:-1] = _glyph_ink(sheet_mask, x, y, width, height)
+    rows[:, -1] = 3
+    return rows.tobytes().translate(_YAFF_ROW_TABLE)
 
 def analyze_character_coverage(font_data):
     """
     Analyze which character ranges are present in the font.
     Returns list of labels to add to filename.
     """
-    metadata_keys = {'height', 'origin', 'scale', 'wrap-width', 'dynamic-size', 'border',
-                     'overlays', 'hooks', 'subfonts', 'notes', 'case-fold', 'null-character',
-                     'default', 'explicit-origins', 'us-font-aliases', 'soviet-font-aliases'}
-
     # Collect all codepoints
     codepoints = set()
     for key, value in font_data.items():
-        if key not in metadata_keys and isinstance(value, dict):
+        if key not in _METADATA_KEYS and isinstance(value, dict):
             try:
                 decimal_code = int(key)
                 unicode_code = get_unicode_codepoint(decimal_code)
@@ -589,24 +624,32 @@ def analyze_character_coverage(font_data):
         return []
 
     # Analyze character ranges
-    has_uppercase = any(0x41 <= cp <= 0x5A for cp in codepoints)
-    has_lowercase = any(0x61 <= cp <= 0x7A for cp in codepoints)
-    ascii_count = sum(1 for cp in codepoints if 0x20 <= cp <= 0x7E)
-    latin1_extended_count = sum(1 for cp in codepoints if 0xA0 <= cp <= 0xFF)
-    latin_extended_count = sum(1 for cp in codepoints if 0x0100 <= cp <= 0x024F)
-    cyrillic_count = sum(1 for cp in codepoints if 0x0400 <= cp <= 0x04FF)
-    greek_count = sum(1 for cp in codepoints if 0x0370 <= cp <= 0x03FF)
-    hiragana_count = sum(1 for cp in codepoints if 0x3040 <= cp <= 0x309F)
-    katakana_count = sum(1 for cp in codepoints if 0x30A0 <= cp <= 0x30FF)
-    kana_count = hiragana_count + katakana_count
-    bopomofo_count = sum(1 for cp in codepoints if 0x3100 <= cp <= 0x312F)
-    boxdraw_count = sum(1 for cp in codepoints if 0x2500 <= cp <= 0x257F)
+    if max(codepoints) < 0x80:
+        # ASCII-only font (the common case): no other block can be present,
+        # so skip the binning
+        counts = {'ascii': sum(1 for cp in codepoints if 0x20 <= cp <= 0x7E)}
+        has_uppercase = any(0x41 <= cp <= 0x5A for cp in codepoints)
+        has_lowercase = any(0x61 <= cp <= 0x7A for cp in codepoints)
+    else:
+        # Bin every codepoint against the block edges in one pass, odd bins
+        # fall inside a block
+        cps = np.fromiter(codepoints, dtype=np.int64, count=len(codepoints))
+        bins = np.searchsorted(_COVERAGE_EDGES, cps, side='right')
+        block_counts = np.bincount(bins, minlength=len(_COVERAGE_EDGES) + 1)[1::2].tolist()
+        counts = dict(zip((name for name, _, _ in _COVERAGE_BLOCKS), block_counts))
+        has_uppercase = bool(np.any((cps >= 0x41) & (cps <= 0x5A)))
+        has_lowercase = bool(np.any((cps >= 0x61) & (cps <= 0x7A)))
+
+    ascii_count = counts.get('ascii', 0)
+    latin1_extended_count = counts.get('latin1', 0)
+    latin_extended_count = counts.get('latinext', 0)
+    cyrillic_count = counts.get('cyrillic', 0)
+    greek_count = counts.get('greek', 0)
+    kana_count = counts.get('hiragana', 0) + counts.get('katakana', 0)
+    bopomofo_count = counts.get('bopomofo', 0)
+    boxdraw_count = counts.get('boxdraw', 0)
     # Symbols: Mathematical Operators + Misc Technical + Arrows + Geometric Shapes
-    symbols_count = sum(1 for cp in codepoints if
-                       (0x2190 <= cp <= 0x21FF) or  # Arrows
-                       (0x2200 <= cp <= 0x22FF) or  # Mathematical Operators
-                       (0x2300 <= cp <= 0x23FF) or  # Miscellaneous Technical
-                       (0x25A0 <= cp <= 0x25FF))    # Geometric Shapes
+    symbols_count = sum(counts.get(name, 0) for name in ('arrows', 'math', 'technical', 'geometric'))
 
     # Determine labels
     labels = []
@@ -641,24 +684,23 @@ def analyze_character_coverage(font_data):
 
     return labels
 
-def generate_font_section(image, font_data, font_name, height, pattern=None):
-    """Generate YAFF glyph definitions for a single font."""
-    yaff_lines = []
-
-    # Collect character definitions (skip metadata keys)
-    metadata_keys = {'height', 'origin', 'scale', 'wrap-width', 'dynamic-size', 'border',
-                     'overlays', 'hooks', 'subfonts', 'notes', 'case-fold', 'null-character',
-                     'default', 'explicit-origins', 'us-font-aliases', 'soviet-font-aliases'}
+def generate_font_section(out, sheet, font_data, font_name, height, pattern=None, sheet_masks=None):
+    """
+    Append UTF-8 encoded YAFF glyph definitions for a single font to a bytearray.
 
+    Returns: number of characters written
+    sheet_masks: Optional dict to reuse sheet ink masks between fonts of one sheet
+    """
     # Get default values if present
     defaults = font_data.get('default', {})
     default_y = defaults.get('y', 0)
     default_h = defaults.get('h', height)
     default_w = defaults.get('w', None)  # Default width for fixed-width fonts
 
+    # Collect character definitions (skip metadata keys)
     chars = []
     for key, value in font_data.items():
-        if key not in metadata_keys and isinstance(value, dict) and 'x' in value:
+        if key not in _METADATA_KEYS and isinstance(value, dict) and 'x' in value:
             try:
                 decimal_code = int(key)
                 chars.append((decimal_code, value))
@@ -666,25 +708,33 @@ def generate_font_section(image, font_data, font_name, height, pattern=None):
                 continue
 
     if not chars:
-        return [], 0
+        return 0
 
     # Sort by character code
     chars.sort(key=lambda x: x[0])
 
+    # Classify the whole sheet once (with pattern for outline/shadow removal)
+    # and slice each glyph out of the mask; fonts with the same rule share it
+    rule = _ink_rule(pattern)
+    if sheet_masks is not None and rule in sheet_masks:
+        sheet_mask = sheet_masks[rule]
+    else:
+        sheet_mask = _ink_mask(sheet, 128, rule)
+        if sheet_masks is not None:
+            sheet_masks[rule] = sheet_mask
+
+    # Width for characters without their own: the default, or else height
+    # for square glyphs in fonts with neither per-char nor default width
+    fallback_w = default_w if default_w is not None else height
+
     # Generate glyphs
     for decimal_code, char_data in chars:
         x = char_data['x']
         # Use character's y if specified, otherwise use default
         y = char_data.get('y', default_y)
 
-        # Use character's w if specified, otherwise use default, fallback to height for square glyphs
-        if 'w' in char_data:
-            w = char_data['w']
-        elif default_w is not None:
-            w = default_w
-        else:
-            # Fallback for fonts with neither per-char nor default width
-            w = height
+        # Use character's w if specified, otherwise the fallback width
+        w = char_data.get('w', fallback_w)
 
         # Use character's h if specified, otherwise use default
         h = char_data.get('h', default_h)
@@ -700,130 +750,205 @@ def generate_font_section(image, font_data, font_name, height, pattern=None):
         # Get Unicode codepoint
         unicode_code = get_unicode_codepoint(decimal_code)
 
-        # Generate labels
-        yaff_lines.append(f"# Character: {chr(unicode_code) if 32 <= unicode_code <= 126 else f'U+{unicode_code:04X}'}")
-        yaff_lines.append(f"u+{unicode_code:04x}:")
+        # Generate labels, after a blank line before each glyph
+        label = _ASCII_LABELS.get(unicode_code) or f'U+{unicode_code:04X}'
+        out += f"\n# Character: {label}\nu+{unicode_code:04x}:\n".encode('utf-8')
 
-        # Extract and write glyph pixels (with pattern for outline/shadow removal)
-        glyph_rows = extract_glyph_pixels(image, x, y, w, h, pattern=pattern)
-        for row in glyph_rows:
-            yaff_lines.append(f"    {row}")
+        # Extract and write glyph pixels, already encoded
+        out += _glyph_rows(sheet_mask, x, y, w, h)
 
-        # Add per-glyph metrics if needed
-        metrics_added = False
+        # Add per-glyph metrics if needed, after a blank line
+        metrics = ""
         if shift_up is not None:
-            if not metrics_added:
-                yaff_lines.append("")
-                metrics_added = True
-            yaff_lines.append(f"    shift-up: {shift_up}")
-
+            metrics += f"    shift-up: {shift_up}\n"
         if 'right-bearing' in char_data:
-            if not metrics_added:
-                yaff_lines.append("")
-                metrics_added = True
-            yaff_lines.append(f"    right-bearing: {char_data['right-bearing']}")
+            metrics += f"    right-bearing: {char_data['right-bearing']}\n"
+        if metrics:
+            out += f"\n{metrics}".encode('utf-8')
 
-        yaff_lines.append("")
+    return len(chars)
 
-    return yaff_lines, len(chars)
-
-def write_single_yaff(output_path, image, font_data, font_name, family_name, height, json_filename, png_filename, pattern=None, game_id=None):
+def _write_file(path, data):
+    """Write bytes to a file with raw os.write calls, bypassing the text and buffer layers."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o666)
+    try:
+        view = memoryview(data)
+        while view:
+            written = os.write(fd, view)
+            view = view[written:]
+    finally:
+        os.close(fd)
+
+def write_single_yaff(output_path, sheet, font_data, font_name, family_name, height, json_filename, png_filename, pattern=None, game_id=None, sheet_masks=None):
     """Write a single YAFF file for one font."""
-    yaff_lines = []
-
     # Load game metadata
     game_metadata_db = load_game_metadata()
     game_metadata = game_metadata_db.get(game_id, {}) if game_id else {}
     game_title = game_metadata.get('title', font_name)
 
-    # Header
-    yaff_lines.append("# YAFF font file")
-    yaff_lines.append(f"# Converted from {json_filename} and {png_filename}")
-    if game_metadata:
-        yaff_lines.append(f"# Source game: {game_title}")
-        if 'year' in game_metadata:
-            yaff_lines.append(f"# Year: {game_metadata['year']}")
-        if 'source' in game_metadata:
-            yaff_lines.append(f"# Publisher: {game_metadata['source']}")
-        if 'platform' in game_metadata:
-            yaff_lines.append(f"# Platform: {game_metadata['platform']}")
-    if pattern and pattern.get('type'):
-        yaff_lines.append(f"# Font type: {pattern['type']}")
-    yaff_lines.append("")
-
-    # Global properties
-    yaff_lines.append("yaff: 1.0")
-    yaff_lines.append(f"name: {game_title}")
-    yaff_lines.append(f"family: {family_name}")
-    yaff_lines.append("encoding: unicode")
-    if game_metadata.get('source'):
-        yaff_lines.append(f"copyright: {game_metadata['source']}")
-    yaff_lines.append("")
-
-    # Metrics
-    yaff_lines.append(f"# Global metrics")
-    if height:
-        yaff_lines.append(f"pixel-size: {height}")
-    yaff_lines.append("")
-
-    # Glyph definitions
-    yaff_lines.append("# Glyph definitions")
-    yaff_lines.append("")
-
-    glyphs, char_count = generate_font_section(image, font_data, font_name, height, pattern)
-    yaff_lines.extend(glyphs)
-
-    # Write YAFF file
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write('\n'.join(yaff_lines))
+    # Optional header lines, each with its own line break
+    source_line = f"# Source game: {game_title}\n" if game_metadata else ""
+    year_line = f"# Year: {game_metadata['year']}\n" if 'year' in game_metadata else ""
+    publisher_line = f"# Publisher: {game_metadata['source']}\n" if 'source' in game_metadata else ""
+    platform_line = f"# Platform: {game_metadata['platform']}\n" if 'platform' in game_metadata else ""
+    type_line = f"# Font type: {pattern['type']}\n" if pattern and pattern.get('type') else ""
+    copyright_line = f"copyright: {game_metadata['source']}\n" if game_metadata.get('source') else ""
+    pixel_size_line = f"pixel-size: {height}\n" if height else ""
+
+    # Header, global properties and metrics, built as one string
+    header = (
+        "# YAFF font file\n"
+        f"# Converted from {json_filename} and {png_filename}\n"
+        f"{source_line}{year_line}{publisher_line}{platform_line}{type_line}"
+        "\n"
+        "yaff: 1.0\n"
+        f"name: {game_title}\n"
+        f"family: {family_name}\n"
+        "encoding: unicode\n"
+        f"{copyright_line}"
+        "\n"
+        "# Global metrics\n"
+        f"{pixel_size_line}"
+        "\n"
+        "# Glyph definitions\n"
+    )
+
+    # Encode the header and glyphs into one buffer and write the YAFF file
+    out = bytearray(header.encode('utf-8'))
+    char_count = generate_font_section(out, sheet, font_data, font_name, height, pattern, sheet_masks)
+    _write_file(output_path, out)
 
     return char_count
 
-def generate_yaff(json_path, png_path, output_dir):
-    """Generate YAFF file(s) from JSON definition and PNG sprite sheet."""
+@lru_cache(maxsize=256)
+def _titlecase(name):
+    """Title-case a game or subfont name (memoized)."""
+    return name.title()
+
+def _build_output_path(output_dir, key, pattern, coverage_labels, height):
+    """
+    Build the YAFF path for a font from its key (game or game-subfont name),
+    coverage labels and dimensions, e.g. yaff/win95_ascii_13.yaff.
+    """
+    # Look up label suffix from coverage; label combinations repeat across fonts
+    labels = tuple(coverage_labels)
+    label_suffix = _LABEL_SUFFIXES.get(labels)
+    if label_suffix is None:
+        label_suffix = _LABEL_SUFFIXES[labels] = "_" + "_".join(labels)
+
+    # Determine filename suffix based on dimensions
+    max_height = pattern.get('max_height', height)
+    if pattern.get('is_monospace', False):
+        # Monospace: heightxwidth format
+        dim_suffix = f"_{max_height}x{pattern.get('max_width', height)}"
+    else:
+        # Proportional: just max height
+        dim_suffix = f"_{max_height}"
+
+    return os.path.join(output_dir, f"{key}{label_suffix}{dim_suffix}.yaff")
+
+def process_subfont(sheet, game_name, base_font_name, subfont_name, subfont_data, height,
+                    output_dir, json_filename, png_filename, sheet_masks=None, sample_patterns=None):
+    """
+    Convert one subfont of a game to its own YAFF file.
+
+    Returns: (output_path, char_count, messages), with output_path None if
+    the subfont was skipped; messages are the report lines to print
+    """
+    messages = []
+    subfont_height = subfont_data.get('height', height)
+
+    # Analyze subfont pattern (may differ from main font)
+    subfont_pattern = analyze_font_pattern(sheet, subfont_data, subfont_height, sample_patterns)
+
+    # Apply override if present (use game-subfont key)
+    subfont_key = f"{game_name}-{subfont_name}"
+    if subfont_key in FONT_TYPE_OVERRIDES:
+        override_type = FONT_TYPE_OVERRIDES[subfont_key]
+        original_type = _apply_override(subfont_pattern, override_type, _SUBFONT_OVERRIDE_FLAGS)
+        messages.append(f"Font type override ({subfont_name}): {original_type} -> {override_type}")
+
+    # Skip multi-color subfonts
+    if subfont_pattern.get('skip'):
+        messages.append(f"SKIPPED {game_name}-{subfont_name}: {subfont_pattern['type']} font (multi-color)")
+        return None, 0, messages
+
+    # Analyze character coverage for subfont
+    subfont_coverage_labels = analyze_character_coverage(subfont_data)
+
+    subfont_output = _build_output_path(output_dir, subfont_key, subfont_pattern, subfont_coverage_labels, subfont_height)
+
+    subfont_count = write_single_yaff(
+        subfont_output, sheet, subfont_data,
+        f"{base_font_name} {_titlecase(subfont_name)}",
+        subfont_key,
+        subfont_height,
+        json_filename, png_filename, subfont_pattern, game_name, sheet_masks
+    )
+    messages.append(f"Generated {os.path.basename(subfont_output)}: {subfont_count} characters")
+
+    return subfont_output, subfont_count, messages
+
+def _init_subfont_worker(sheet, game_metadata):
+    """
+    Keep the game's sprite sheet, plus fresh mask and sample caches, in a
+    subfont worker process, and give it the game metadata loaded by the parent.
+    """
+    global _SUBFONT_WORKER_STATE
+    _SUBFONT_WORKER_STATE = (sheet, {}, {})
+    set_game_metadata(game_metadata)
+
+def _process_subfont_in_worker(task):
+    """Run process_subfont in a worker process set up by _init_subfont_worker."""
+    sheet, sheet_masks, sample_patterns = _SUBFONT_WORKER_STATE
+    return process_subfont(sheet, *task, sheet_masks, sample_patterns)
+
+def generate_yaff(json_path, png_path, output_dir, jobs=1):
+    """
+    Generate YAFF file(s) from JSON definition and PNG sprite sheet.
+    With jobs > 1, subfonts are converted in up to that many worker processes.
+
+    Returns: (generated, skipped) counts of font files
+    """
 
     # Load JSON definition
     with open(json_path, 'r') as f:
-        font_data = json.load(f, object_pairs_hook=OrderedDict)
-
-    # Load PNG sprite sheet
-    image = Image.open(png_path)
+        font_data = json.load(f)
+
+    # Load PNG sprite sheet, decoded and converted to RGBA once to handle all
+    # image modes consistently; the file is closed as soon as the pixels are in.
+    # RGBA sheets are taken as decoded, without convert()'s extra image copy
+    with Image.open(png_path) as image:
+        if image.mode != 'RGBA':
+            image = image.convert('RGBA')
+        sheet = np.asarray(image)
+    sheet_masks = {}
+    sample_patterns = {}
 
     # Extract metadata
     height = font_data.get('height', 13)
 
-    # Determine base names from directory
-    game_name = os.path.basename(os.path.dirname(json_path))
-    base_font_name = game_name.replace('_', ' ').title()
+    # Determine base names from directory; one split yields both the game
+    # directory and the JSON file name
+    json_dir, json_filename = os.path.split(json_path)
+    game_name = os.path.basename(json_dir)
+    base_font_name = _titlecase(game_name.replace('_', ' '))
 
-    json_filename = os.path.basename(json_path)
     png_filename = os.path.basename(png_path)
 
     # Analyze main font pattern
-    pattern = analyze_font_pattern(image, font_data, height)
+    pattern = analyze_font_pattern(sheet, font_data, height, sample_patterns)
 
     # Apply override if present
     if game_name in FONT_TYPE_OVERRIDES:
         override_type = FONT_TYPE_OVERRIDES[game_name]
-        original_type = pattern['type']
-        pattern['type'] = override_type
-        # Set or clear shadow/outline removal flags based on override type
-        if override_type in ['antialiased', 'unknown', 'chromatic_bright']:
-            pattern['remove_shadow'] = False
-            pattern['remove_outline'] = False
-        elif override_type in ['shadowed', 'chromatic_shadowed', 'chromatic_shadowed_bright']:
-            pattern['remove_shadow'] = True
-            pattern['remove_outline'] = False
-        elif override_type in ['outlined', 'chromatic_outlined']:
-            pattern['remove_shadow'] = False
-            pattern['remove_outline'] = True
-        # Preserve other pattern data (monospace, dimensions, etc.)
+        original_type = _apply_override(pattern, override_type, _OVERRIDE_FLAGS)
         print(f"Font type override: {original_type} -> {override_type}")
 
     # Skip multi-color fonts
     if pattern.get('skip'):
         print(f"SKIPPED {game_name}: {pattern['type']} font (multi-color not supported)")
-        return
+        return 0, 1
 
     # Report detected pattern
     is_monospace = pattern.get('is_monospace', False)
@@ -831,145 +956,150 @@ def generate_yaff(json_path, png_path, output_dir):
     max_height = pattern.get('max_height', height)
 
     if pattern.get('type'):
-        print(f"Detected: {pattern['type']} font", end='')
+        report = [f"Detected: {pattern['type']} font"]
         if is_monospace:
-            print(f" ({max_height}x{max_width})", end='')
+            report.append(f" ({max_height}x{max_width})")
         else:
-            print(f" (max {max_height}px)", end='')
+            report.append(f" (max {max_height}px)")
         if pattern.get('remove_outline'):
             if pattern['type'] == 'chromatic_outlined':
                 ch = pattern.get('dominant_channel', '?')
-                print(f" (removing dark {ch} outline, {int(pattern.get('dark_ratio', 0) * 100)}% dark)")
+                report.append(f" (removing dark {ch} outline, {int(pattern.get('dark_ratio', 0) * 100)}% dark)")
             else:
-                print(" (removing black outline)")
+                report.append(" (removing black outline)")
         elif pattern.get('remove_shadow'):
             if pattern['type'] == 'chromatic_shadowed':
                 ch = pattern.get('dominant_channel', '?')
-                print(f" (removing dark {ch} shadow, {int(pattern.get('dark_ratio', 0) * 100)}% dark)")
+                report.append(f" (removing dark {ch} shadow, {int(pattern.get('dark_ratio', 0) * 100)}% dark)")
             else:
-                print(f" (removing shadow, {int(pattern.get('dark_ratio', pattern.get('black_ratio', 0)) * 100)}% black)")
-        else:
-            print()
+                report.append(f" (removing shadow, {int(pattern.get('dark_ratio', pattern.get('black_ratio', 0)) * 100)}% black)")
+        print(''.join(report))
 
-    # Check if there are subfonts
-    subfonts = font_data.get('subfonts', {})
-    has_subfonts = len(subfonts) > 0
+    # Subfonts, if any; None when absent, so the common case builds no empty dict
+    subfonts = font_data.get('subfonts')
 
     generated_files = []
+    skipped_count = 0
     total_chars = 0
 
     # Analyze character coverage for labeling
     coverage_labels = analyze_character_coverage(font_data)
 
-    # Build label suffix from coverage
-    label_suffix = ""
-    if coverage_labels:
-        label_suffix = "_" + "_".join(coverage_labels)
-
-    # Determine filename suffix based on dimensions
-    if is_monospace:
-        # Monospace: heightxwidth format
-        dim_suffix = f"_{max_height}x{max_width}"
-    else:
-        # Proportional: just max height
-        dim_suffix = f"_{max_height}"
-
     # Process main font
-    main_output = os.path.join(output_dir, f"{game_name}{label_suffix}{dim_suffix}.yaff")
+    main_output = _build_output_path(output_dir, game_name, pattern, coverage_labels, height)
     main_count = write_single_yaff(
-        main_output, image, font_data,
+        main_output, sheet, font_data,
         f"{base_font_name} Font", game_name, height,
-        json_filename, png_filename, pattern, game_name
+        json_filename, png_filename, pattern, game_name, sheet_masks
     )
     generated_files.append(main_output)
     total_chars += main_count
     print(f"Generated {os.path.basename(main_output)}: {main_count} characters")
 
-    # Process subfonts if present - each gets its own file
-    if has_subfonts:
-        for subfont_name, subfont_data in subfonts.items():
-            subfont_height = subfont_data.get('height', height)
-
-            # Analyze subfont pattern (may differ from main font)
-            subfont_pattern = analyze_font_pattern(image, subfont_data, subfont_height)
-
-            # Apply override if present (use game-subfont key)
-            subfont_key = f"{game_name}-{subfont_name}"
-            if subfont_key in FONT_TYPE_OVERRIDES:
-                override_type = FONT_TYPE_OVERRIDES[subfont_key]
-                original_type = subfont_pattern['type']
-                subfont_pattern['type'] = override_type
-                # Clear shadow/outline removal flags for antialiased/unknown types
-                if override_type in ['antialiased', 'unknown']:
-                    subfont_pattern['remove_shadow'] = False
-                    subfont_pattern['remove_outline'] = False
-                print(f"Font type override ({subfont_name}): {original_type} -> {override_type}")
-
-            # Skip multi-color subfonts
-            if subfont_pattern.get('skip'):
-                print(f"SKIPPED {game_name}-{subfont_name}: {subfont_pattern['type']} font (multi-color)")
+    if not subfonts:
+        print(f"\nTotal: {len(generated_files)} file(s), {total_chars} characters")
+        return len(generated_files), skipped_count
+
+    # Process subfonts - each gets its own file
+    tasks = [
+        (game_name, base_font_name, subfont_name, subfont_data, height,
+         output_dir, json_filename, png_filename)
+        for subfont_name, subfont_data in subfonts.items()
+    ]
+    if jobs > 1 and len(tasks) > 1:
+        # Workers get the sheet and game metadata once through the initializer,
+        # not per subfont, and do not read generators.js again
+        pool = ProcessPoolExecutor(max_workers=min(jobs, len(tasks)),
+                                   initializer=_init_subfont_worker,
+                                   initargs=(sheet, load_game_metadata()))
+        results = pool.map(_process_subfont_in_worker, tasks)
+    else:
+        pool = None
+        results = (process_subfont(sheet, *task, sheet_masks, sample_patterns) for task in tasks)
+
+    # Report in subfont order as the results come in
+    try:
+        for subfont_output, subfont_count, messages in results:
+            for message in messages:
+                print(message)
+            if subfont_output is None:
+                skipped_count += 1
                 continue
+            generated_files.append(subfont_output)
+            total_chars += subfont_count
+    finally:
+        if pool is not None:
+            pool.shutdown()
 
-            # Analyze character coverage for subfont
-            subfont_coverage_labels = analyze_character_coverage(subfont_data)
+    print(f"\nTotal: {len(generated_files)} file(s), {total_chars} characters")
 
-            # Build label suffix from coverage
-            subfont_label_suffix = ""
-            if subfont_coverage_labels:
-                subfont_label_suffix = "_" + "_".join(subfont_coverage_labels)
+    return len(generated_files), skipped_count
 
-            # Determine suffix based on dimensions
-            subfont_is_mono = subfont_pattern.get('is_monospace', False)
-            subfont_max_width = subfont_pattern.get('max_width', subfont_height)
-            subfont_max_height = subfont_pattern.get('max_height', subfont_height)
+def convert(game_dir, output_dir, jobs=1):
+    """
+    Convert one Death Generator game directory to YAFF file(s) in output_dir,
+    using up to jobs worker processes for subfonts.
 
-            if subfont_is_mono:
-                subfont_dim_suffix = f"_{subfont_max_height}x{subfont_max_width}"
-            else:
-                subfont_dim_suffix = f"_{subfont_max_height}"
+    Returns: (generated, skipped) counts of font files
+    Raises: FileNotFoundError if the game's JSON or PNG is missing
+    """
+    game_name = os.path.basename(os.path.normpath(game_dir))
 
-            subfont_output = os.path.join(output_dir, f"{game_name}-{subfont_name}{subfont_label_suffix}{subfont_dim_suffix}.yaff")
+    json_name = f"{game_name}.json"
+    png_name = f"{game_name}-font.png"
+    json_path = os.path.join(game_dir, json_name)
+    png_path = os.path.join(game_dir, png_name)
 
-            subfont_count = write_single_yaff(
-                subfont_output, image, subfont_data,
-                f"{base_font_name} {subfont_name.title()}",
-                f"{game_name}-{subfont_name}",
-                subfont_height,
-                json_filename, png_filename, subfont_pattern, game_name
-            )
+    # Check files exist with one directory read; only a miss falls back to a
+    # stat, which also covers case-insensitive file systems
+    try:
+        with os.scandir(game_dir) as entries:
+            names = {entry.name for entry in entries}
+    except OSError:
+        names = set()
 
-            generated_files.append(subfont_output)
-            total_chars += subfont_count
-            print(f"Generated {os.path.basename(subfont_output)}: {subfont_count} characters")
+    for name, path in ((json_name, json_path), (png_name, png_path)):
+        if name not in names and not os.path.exists(path):
+            raise FileNotFoundError(f"{path} not found")
 
-    print(f"\nTotal: {len(generated_files)} file(s), {total_chars} characters")
+    # Create output directory if needed
+    os.makedirs(output_dir, exist_ok=True)
+    return generate_yaff(json_path, png_path, output_dir, jobs)
 
 def main():
-    if len(sys.argv) < 3:
-        print("Usage: python deathgenerator2yaff.py <game_dir> <output_dir>")
+    args = sys.argv[1:]
+
+    # Optional --jobs N or --jobs=N: convert subfonts in N worker processes
+    jobs = 1
+    for i, arg in enumerate(args):
+        if arg == '--jobs':
+            value = args[i + 1] if i + 1 < len(args) else ''
+            del args[i:i + 2]
+        elif arg.startswith('--jobs='):
+            value = arg[len('--jobs='):]
+            del args[i]
+        else:
+            continue
+        try:
+            jobs = int(value)
+        except ValueError:
+            jobs = 0
+        break
+
+    if len(args) < 2 or jobs < 1:
+        print("Usage: python deathgenerator2yaff.py [--jobs N] <game_dir> <output_dir>")
         print("Example: python deathgenerator2yaff.py games/win95 yaff")
         sys.exit(1)
 
-    game_dir = sys.argv[1]
-    output_dir = sys.argv[2]
-    game_name = os.path.basename(os.path.normpath(game_dir))
-
-    json_path = os.path.join(game_dir, f"{game_name}.json")
-    png_path = os.path.join(game_dir, f"{game_name}-font.png")
-
-    # Check files exist
-    if not os.path.exists(json_path):
-        print(f"Error: {json_path} not found")
-        sys.exit(1)
+    game_dir = args[0]
+    output_dir = args[1]
 
-    if not os.path.exists(png_path):
-        print(f"Error: {png_path} not found")
+    try:
+        convert(game_dir, output_dir, jobs)
+    except FileNotFoundError as e:
+        print(f"Error: {e}")
         sys.exit(1)
 
-    # Create output directory if needed
-    os.makedirs(output_dir, exist_ok=True)
-    generate_yaff(json_path, png_path, output_dir)
-
 if __name__ == '__main__':
     main()
 